@@ -3,17 +3,19 @@ Advanced Prediction Agent para predicciones avanzadas de impacto
 Integrado desde workspace/prototipo1/agents/neo_prediction_agent/
 """
 
+import asyncio
+import json
 import os
-import time
 import psycopg2
 import psycopg2.extras
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from .base_agent import BaseAgent, AgentState
+from ..database.connection import connection
 
 logger = logging.getLogger(__name__)
 
@@ -23,45 +25,37 @@ class AdvancedPredictionAgent(BaseAgent):
     de asteroides usando técnicas de machine learning
     """
     
+    # Niveles de riesgo que requieren monitoreo prioritario (se construye
+    # una vez al cargar la clase, no en cada fila)
+    _HIGH_RISK_LEVELS = frozenset({"Extreme", "High"})
+    
     def __init__(self):
         super().__init__()
         self.name = "AdvancedPredictionAgent"
         self.description = "Agente de Predicción Avanzada para análisis de impacto"
         self.database_url = os.getenv("DATABASE_URL")
     
-    def _get_connection(self, retries: int = 5, delay: int = 5):
-        """Intentos de conexión a la base de datos con reintentos."""
-        for i in range(retries):
-            try:
-                conn = psycopg2.connect(
-                    self.database_url, 
-                    cursor_factory=psycopg2.extras.RealDictCursor
-                )
-                return conn
-            except psycopg2.OperationalError:
-                logger.warning(f"[Advanced Prediction Agent] DB no disponible, reintentando ({i+1}/{retries})...")
-                time.sleep(delay)
-        raise Exception("[Advanced Prediction Agent] No se pudo conectar a la DB")
-    
     def _predict_impact(self) -> Dict[str, Any]:
         """Realiza predicciones avanzadas de impacto para NEOs peligrosos"""
-        conn = self._get_connection()
         try:
-            cur = conn.cursor()
-            
             logger.info("[Advanced Impact Prediction Agent] Iniciando análisis completo...")
             
-            # Obtener NEOs peligrosos
-            cur.execute(
-                "SELECT * FROM neos_dangerous WHERE is_potentially_hazardous = TRUE;"
-            )
-            rows = cur.fetchall()
+            # La conexión solo se retiene durante la consulta, no durante el
+            # cálculo con pandas. Cursor de tuplas: las filas van directo a un DataFrame
+            with connection(self.database_url) as conn, conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+                # Obtener NEOs peligrosos (solo las columnas usadas en el análisis)
+                cur.execute(
+                    "SELECT neo_id, name, diameter_min_m, diameter_max_m, velocity_km_s, miss_distance_km "
+                    "FROM neos_dangerous WHERE is_potentially_hazardous = TRUE;"
+                )
+                rows = cur.fetchall()
+                columns = [col.name for col in cur.description]
             
             if not rows:
                 logger.warning("[Advanced Impact Prediction Agent] No hay NEOs peligrosos para analizar")
                 return self._get_empty_predictions()
             
-            df = pd.DataFrame(rows)
+            df = pd.DataFrame(rows, columns=columns)
             logger.info(f"[Advanced Impact Prediction Agent] Analizando {len(df)} NEOs peligrosos")
             
             # === CÁLCULO DE PROPIEDADES FÍSICAS ===
@@ -86,21 +80,24 @@ class AdvancedPredictionAgent(BaseAgent):
             df["seismic_magnitude"] = 0.67 * np.log10(df["kinetic_energy_mt_tnt"]) + 4.0
             
             # === CLASIFICACIÓN DE RIESGO ===
-            def classify_risk(row):
-                if row["kinetic_energy_mt_tnt"] > 1000 and row["impact_probability"] > 0.01:
-                    return "Extreme"
-                elif row["kinetic_energy_mt_tnt"] > 100 and row["impact_probability"] > 0.001:
-                    return "High"
-                elif row["kinetic_energy_mt_tnt"] > 10 and row["impact_probability"] > 0.0001:
-                    return "Medium"
-                else:
-                    return "Low"
-            
-            df["risk_level"] = df.apply(classify_risk, axis=1)
+            # Vectorizada: la primera condición que se cumple determina el nivel
+            energy = df["kinetic_energy_mt_tnt"]
+            probability = df["impact_probability"]
+            df["risk_level"] = np.select(
+                [
+                    (energy > 1000) & (probability > 0.01),
+                    (energy > 100) & (probability > 0.001),
+                    (energy > 10) & (probability > 0.0001)
+                ],
+                ["Extreme", "High", "Medium"],
+                default="Low"
+            )
             
             # === PREDICCIONES TEMPORALES ===
+            # Calculadas de una vez para todo el DataFrame
+            temporal_predictions = self._generate_temporal_predictions(df)
             predictions = []
-            for _, row in df.iterrows():
+            for (_, row), temporal in zip(df.iterrows(), temporal_predictions):
                 prediction = {
                     "neo_id": row["neo_id"],
                     "name": row["name"],
@@ -120,16 +117,16 @@ class AdvancedPredictionAgent(BaseAgent):
                     },
                     "risk_assessment": {
                         "risk_level": row["risk_level"],
-                        "monitoring_priority": "High" if row["risk_level"] in ["Extreme", "High"] else "Medium",
+                        "monitoring_priority": "High" if row["risk_level"] in self._HIGH_RISK_LEVELS else "Medium",
                         "evacuation_radius_km": float(row["damage_radius_km"]),
                         "tsunami_risk": "High" if row["kinetic_energy_mt_tnt"] > 10 and row["miss_distance_km"] < 1000000 else "Low"
                     },
-                    "temporal_predictions": self._generate_temporal_predictions(row),
+                    "temporal_predictions": temporal,
                     "confidence_score": self._calculate_confidence_score(row)
                 }
                 predictions.append(prediction)
             
-            # Almacenar predicciones en la base de datos
+            # Almacenar predicciones
             self._store_predictions(predictions)
             
             # Resumen estadístico
@@ -138,7 +135,7 @@ class AdvancedPredictionAgent(BaseAgent):
                 "risk_distribution": df["risk_level"].value_counts().to_dict(),
                 "avg_impact_probability": float(df["impact_probability"].mean()),
                 "max_kinetic_energy_mt": float(df["kinetic_energy_mt_tnt"].max()),
-                "high_risk_count": int((df["risk_level"].isin(["High", "Extreme"])).sum()),
+                "high_risk_count": int((df["risk_level"].isin(self._HIGH_RISK_LEVELS)).sum()),
                 "predictions": predictions,
                 "generated_at": datetime.now().isoformat()
             }
@@ -149,9 +146,6 @@ class AdvancedPredictionAgent(BaseAgent):
         except Exception as e:
             logger.error(f"[Advanced Impact Prediction Agent] Error en predicción: {e}")
             return self._get_empty_predictions()
-        finally:
-            cur.close()
-            conn.close()
     
     def _get_empty_predictions(self) -> Dict[str, Any]:
         """Retorna predicciones vacías cuando no hay datos"""
@@ -165,34 +159,44 @@ class AdvancedPredictionAgent(BaseAgent):
             "generated_at": datetime.now().isoformat()
         }
     
-    def _generate_temporal_predictions(self, row: pd.Series) -> Dict[str, Any]:
-        """Genera predicciones temporales para un NEO específico"""
-        # Simular predicciones para los próximos 10 años
-        years = list(range(1, 11))
-        predictions = []
+    def _generate_temporal_predictions(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Genera predicciones temporales para cada NEO del DataFrame"""
+        # Simular predicciones para los próximos 10 años: una matriz
+        # (NEOs x años) calculada con NumPy para todo el DataFrame
+        years = np.arange(1, 11)
         
-        for year in years:
-            # Simular evolución de la probabilidad de impacto
-            base_prob = row["impact_probability"]
-            time_factor = 1 + (year * 0.1)  # Aumenta con el tiempo
-            predicted_prob = min(1.0, base_prob * time_factor)
-            
-            # Simular evolución de la energía cinética
-            energy_factor = 1 + (year * 0.05)  # Ligero aumento
-            predicted_energy = row["kinetic_energy_mt_tnt"] * energy_factor
-            
-            predictions.append({
-                "year": year,
-                "impact_probability": float(predicted_prob),
-                "kinetic_energy_mt_tnt": float(predicted_energy),
-                "confidence": max(0.5, 1.0 - (year * 0.05))  # Disminuye con el tiempo
-            })
+        # Simular evolución de la probabilidad de impacto (aumenta con el tiempo)
+        predicted_probs = np.minimum(1.0, df["impact_probability"].to_numpy()[:, None] * (1 + years * 0.1))
         
-        return {
-            "temporal_predictions": predictions,
-            "trend": "increasing" if predictions[-1]["impact_probability"] > predictions[0]["impact_probability"] else "decreasing",
-            "peak_year": max(predictions, key=lambda x: x["impact_probability"])["year"]
-        }
+        # Simular evolución de la energía cinética (ligero aumento)
+        predicted_energies = df["kinetic_energy_mt_tnt"].to_numpy()[:, None] * (1 + years * 0.05)
+        
+        # La confianza disminuye con el tiempo (igual para todos los NEOs)
+        confidences = np.maximum(0.5, 1.0 - years * 0.05).tolist()
+        
+        trends = np.where(predicted_probs[:, -1] > predicted_probs[:, 0], "increasing", "decreasing")
+        peak_years = years[np.argmax(predicted_probs, axis=1)]
+        
+        # tolist() convierte a tipos nativos de Python de una sola vez
+        year_list = years.tolist()
+        return [
+            {
+                "temporal_predictions": [
+                    {
+                        "year": year,
+                        "impact_probability": prob,
+                        "kinetic_energy_mt_tnt": energy,
+                        "confidence": confidence
+                    }
+                    for year, prob, energy, confidence in zip(year_list, probs, energies, confidences)
+                ],
+                "trend": trend,
+                "peak_year": peak_year
+            }
+            for probs, energies, trend, peak_year in zip(
+                predicted_probs.tolist(), predicted_energies.tolist(), trends.tolist(), peak_years.tolist()
+            )
+        ]
     
     def _calculate_confidence_score(self, row: pd.Series) -> float:
         """Calcula un score de confianza para las predicciones"""
@@ -207,38 +211,37 @@ class AdvancedPredictionAgent(BaseAgent):
     
     def _store_predictions(self, predictions: List[Dict[str, Any]]) -> bool:
         """Almacena predicciones en la base de datos"""
-        conn = self._get_connection()
         try:
-            cur = conn.cursor()
-            
-            # Crear tabla si no existe
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS advanced_predictions (
-                id SERIAL PRIMARY KEY,
-                neo_id VARCHAR(64) NOT NULL,
-                prediction_data JSONB NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            
-            # Insertar predicciones
-            for prediction in predictions:
+            with connection(self.database_url) as conn, conn.cursor() as cur:
+                # Crear tabla si no existe
                 cur.execute("""
+                CREATE TABLE IF NOT EXISTS advanced_predictions (
+                    id SERIAL PRIMARY KEY,
+                    neo_id VARCHAR(64) NOT NULL,
+                    prediction_data JSONB NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+                """)
+                
+                # Insertar predicciones en lote (un INSERT multi-fila por página)
+                insert_query = """
                 INSERT INTO advanced_predictions (neo_id, prediction_data)
-                VALUES (%s, %s)
-                """, (prediction["neo_id"], json.dumps(prediction)))
+                VALUES %s
+                """
+                psycopg2.extras.execute_values(
+                    cur,
+                    insert_query,
+                    [(prediction["neo_id"], json.dumps(prediction)) for prediction in predictions],
+                    page_size=100
+                )
             
-            conn.commit()
+            # El commit ocurre al salir del context manager
             logger.info(f"[Advanced Prediction Agent] {len(predictions)} predicciones almacenadas")
             return True
             
         except Exception as e:
             logger.error(f"[Advanced Prediction Agent] Error almacenando predicciones: {e}")
-            conn.rollback()
             return False
-        finally:
-            cur.close()
-            conn.close()
     
     async def execute(self, state: AgentState) -> AgentState:
         """
@@ -248,7 +251,7 @@ class AdvancedPredictionAgent(BaseAgent):
             logger.info(f"[Advanced Prediction Agent] Iniciando predicciones avanzadas...")
             
             # Realizar predicciones de impacto
-            predictions = self._predict_impact()
+            predictions = await asyncio.to_thread(self._predict_impact)
             
             # Actualizar estado
             state.advanced_predictions = predictions
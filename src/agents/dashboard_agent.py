@@ -3,19 +3,38 @@ Dashboard Agent para generación de métricas y análisis estadístico
 Integrado desde workspace/prototipo1/agents/neo_dashboard_agent/
 """
 
+import asyncio
 import os
-import time
+import threading
+from contextlib import nullcontext
 import psycopg2
 import psycopg2.extras
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 import logging
 from datetime import datetime
 
 from .base_agent import BaseAgent, AgentState
+from ..database.connection import connection
 
 logger = logging.getLogger(__name__)
 
+# Tabla donde se guardan las métricas de cada ejecución
+DASHBOARD_RESULTS_DDL = """
+CREATE TABLE IF NOT EXISTS dashboard_results (
+    id SERIAL PRIMARY KEY,
+    metric_name VARCHAR(255) NOT NULL,
+    value DECIMAL(15,6) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# DSNs en los que ya se creó el índice de métricas históricas. CREATE INDEX
+# toma un ShareLock sobre la tabla aunque el índice exista, así que se
+# ejecuta una sola vez por proceso y fuera de la transacción de escritura
+_history_index_ready: Set[str] = set()
+_history_index_lock = threading.Lock()
+
 class DashboardAgent(BaseAgent):
     """
     Agente Dashboard para generación de métricas y análisis estadístico
@@ -28,70 +47,60 @@ class DashboardAgent(BaseAgent):
         self.description = "Agente Dashboard para generación de métricas y análisis estadístico"
         self.database_url = os.getenv("DATABASE_URL")
     
-    def _get_connection(self, retries: int = 5, delay: int = 5):
-        """Intentos de conexión a la base de datos con reintentos."""
-        for i in range(retries):
-            try:
-                conn = psycopg2.connect(
-                    self.database_url, 
-                    cursor_factory=psycopg2.extras.RealDictCursor
-                )
-                return conn
-            except psycopg2.OperationalError:
-                logger.warning(f"[Dashboard Agent] DB no disponible, reintentando ({i+1}/{retries})...")
-                time.sleep(delay)
-        raise Exception("[Dashboard Agent] No se pudo conectar a la DB")
-    
-    def _generate_metrics(self) -> Dict[str, Any]:
+    def _generate_metrics(self, generated_at: Optional[str] = None) -> Dict[str, Any]:
         """Genera métricas del dashboard basadas en datos de NEOs"""
-        conn = self._get_connection()
+        generated_at = generated_at or datetime.now().isoformat()
         try:
-            cur = conn.cursor()
-            
-            logger.info("[Dashboard Agent] Consultando NEOs peligrosos...")
-            
-            # Consultar NEOs peligrosos
-            cur.execute(
-                "SELECT * FROM neos_dangerous WHERE is_potentially_hazardous = TRUE;"
-            )
-            rows = cur.fetchall()
-            
-            if not rows:
-                logger.warning("[Dashboard Agent] No hay NEOs peligrosos")
-                return self._get_empty_metrics()
-            
-            df = pd.DataFrame(rows)
-            logger.info(f"[Dashboard Agent] Encontrados {len(df)} NEOs peligrosos")
-            
-            # Calcular métricas
-            total_neos = len(df)
-            avg_velocity = df["velocity_km_s"].mean() if "velocity_km_s" in df.columns else 0
-            avg_diameter = df[["diameter_min_m", "diameter_max_m"]].mean().mean() if "diameter_min_m" in df.columns else 0
-            
-            metrics = {
-                "total_dangerous_neos": int(total_neos),
-                "average_velocity_km_s": float(avg_velocity) if not pd.isna(avg_velocity) else 0.0,
-                "average_diameter_m": float(avg_diameter) if not pd.isna(avg_diameter) else 0.0,
-                "max_velocity_km_s": float(df["velocity_km_s"].max()) if "velocity_km_s" in df.columns and not pd.isna(df["velocity_km_s"].max()) else 0.0,
-                "min_velocity_km_s": float(df["velocity_km_s"].min()) if "velocity_km_s" in df.columns and not pd.isna(df["velocity_km_s"].min()) else 0.0,
-                "max_diameter_m": float(df[["diameter_min_m", "diameter_max_m"]].max().max()) if "diameter_min_m" in df.columns and not pd.isna(df[["diameter_min_m", "diameter_max_m"]].max().max()) else 0.0,
-                "min_diameter_m": float(df[["diameter_min_m", "diameter_max_m"]].min().min()) if "diameter_min_m" in df.columns and not pd.isna(df[["diameter_min_m", "diameter_max_m"]].min().min()) else 0.0,
-                "generated_at": datetime.now().isoformat()
-            }
-            
-            # Almacenar métricas en la base de datos
-            self._store_metrics(metrics)
-            
-            return metrics
+            with connection(self.database_url) as conn, conn.cursor() as cur:
+                logger.info("[Dashboard Agent] Consultando NEOs peligrosos...")
+                
+                # Agregados calculados en PostgreSQL: una sola fila en vez de
+                # traer todos los NEOs peligrosos a un DataFrame
+                cur.execute("""
+                SELECT COUNT(*) AS total_neos,
+                       AVG(velocity_km_s) AS avg_velocity,
+                       MAX(velocity_km_s) AS max_velocity,
+                       MIN(velocity_km_s) AS min_velocity,
+                       AVG(diameter_min_m) AS avg_diameter_min,
+                       AVG(diameter_max_m) AS avg_diameter_max,
+                       GREATEST(MAX(diameter_min_m), MAX(diameter_max_m)) AS max_diameter,
+                       LEAST(MIN(diameter_min_m), MIN(diameter_max_m)) AS min_diameter
+                FROM neos_dangerous
+                WHERE is_potentially_hazardous = TRUE
+                """)
+                row = cur.fetchone()
+                
+                if not row or not row["total_neos"]:
+                    logger.warning("[Dashboard Agent] No hay NEOs peligrosos")
+                    return self._get_empty_metrics(generated_at)
+                
+                logger.info(f"[Dashboard Agent] Encontrados {row['total_neos']} NEOs peligrosos")
+                
+                # Promedio de diámetro: media de las medias mínima y máxima disponibles
+                diameter_avgs = [v for v in (row["avg_diameter_min"], row["avg_diameter_max"]) if v is not None]
+                avg_diameter = sum(diameter_avgs) / len(diameter_avgs) if diameter_avgs else 0.0
+                
+                metrics = {
+                    "total_dangerous_neos": int(row["total_neos"]),
+                    "average_velocity_km_s": float(row["avg_velocity"] or 0.0),
+                    "average_diameter_m": float(avg_diameter),
+                    "max_velocity_km_s": float(row["max_velocity"] or 0.0),
+                    "min_velocity_km_s": float(row["min_velocity"] or 0.0),
+                    "max_diameter_m": float(row["max_diameter"] or 0.0),
+                    "min_diameter_m": float(row["min_diameter"] or 0.0),
+                    "generated_at": generated_at
+                }
+                
+                # Almacenar métricas reutilizando la conexión abierta
+                self._store_metrics(metrics, conn)
+                
+                return metrics
             
         except Exception as e:
             logger.error(f"[Dashboard Agent] Error generando métricas: {e}")
-            return self._get_empty_metrics()
-        finally:
-            cur.close()
-            conn.close()
+            return self._get_empty_metrics(generated_at)
     
-    def _get_empty_metrics(self) -> Dict[str, Any]:
+    def _get_empty_metrics(self, generated_at: Optional[str] = None) -> Dict[str, Any]:
         """Retorna métricas vacías cuando no hay datos"""
         return {
             "total_dangerous_neos": 0,
@@ -101,68 +110,96 @@ class DashboardAgent(BaseAgent):
             "min_velocity_km_s": 0.0,
             "max_diameter_m": 0.0,
             "min_diameter_m": 0.0,
-            "generated_at": datetime.now().isoformat()
+            "generated_at": generated_at or datetime.now().isoformat()
         }
     
-    def _store_metrics(self, metrics: Dict[str, Any]) -> bool:
-        """Almacena métricas en la base de datos"""
-        conn = self._get_connection()
-        try:
-            cur = conn.cursor()
-            
-            # Crear tabla si no existe
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS dashboard_results (
-                id SERIAL PRIMARY KEY,
-                metric_name VARCHAR(255) NOT NULL,
-                value DECIMAL(15,6) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            
-            # Insertar métricas
-            for metric_name, value in metrics.items():
-                if metric_name != "generated_at" and isinstance(value, (int, float)):
+    def _ensure_history_index(self) -> None:
+        """
+        Crea una vez por proceso el índice de cobertura usado por la
+        consulta de métricas históricas.
+        
+        Va en su propia transacción: si se creara junto a los INSERT, dos
+        ejecuciones concurrentes tomarían el ShareLock del índice y luego
+        se bloquearían mutuamente al insertar (deadlock).
+        """
+        if self.database_url in _history_index_ready:
+            return
+        with _history_index_lock:
+            if self.database_url in _history_index_ready:
+                return
+            try:
+                with connection(self.database_url) as conn, conn.cursor() as cur:
+                    cur.execute(DASHBOARD_RESULTS_DDL)
                     cur.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_dashboard_results_created_at
+                    ON dashboard_results (created_at) INCLUDE (metric_name, value)
+                    """)
+                _history_index_ready.add(self.database_url)
+            except Exception as e:
+                logger.warning(f"[Dashboard Agent] No se pudo crear el índice de métricas históricas: {e}")
+    
+    def _store_metrics(self, metrics: Dict[str, Any], conn=None) -> bool:
+        """
+        Almacena métricas en la base de datos.
+        
+        Si se recibe una conexión abierta se reutiliza, evitando abrir
+        una segunda conexión mientras la primera sigue activa.
+        """
+        owns_conn = conn is None
+        conn_ctx = connection(self.database_url) if owns_conn else nullcontext(conn)
+        try:
+            with conn_ctx as conn, conn.cursor() as cur:
+                # Crear tabla si no existe (ya creada junto al índice si este está listo)
+                if self.database_url not in _history_index_ready:
+                    cur.execute(DASHBOARD_RESULTS_DDL)
+                
+                # Insertar métricas en lote (un INSERT multi-fila)
+                psycopg2.extras.execute_values(
+                    cur,
+                    """
                     INSERT INTO dashboard_results (metric_name, value)
-                    VALUES (%s, %s)
-                    """, (metric_name, value))
-            
-            conn.commit()
-            logger.info("[Dashboard Agent] Métricas almacenadas en la base de datos")
-            return True
+                    VALUES %s
+                    """,
+                    [
+                        (metric_name, value)
+                        for metric_name, value in metrics.items()
+                        if metric_name != "generated_at" and isinstance(value, (int, float))
+                    ]
+                )
+                
+                conn.commit()
+                logger.info("[Dashboard Agent] Métricas almacenadas en la base de datos")
+                return True
             
         except Exception as e:
             logger.error(f"[Dashboard Agent] Error almacenando métricas: {e}")
-            conn.rollback()
+            # Deshacer la transacción de quien prestó la conexión; si esta
+            # se cayó, el rollback también falla y no debe ocultar las métricas
+            if not owns_conn and not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error as rollback_error:
+                    logger.warning(f"[Dashboard Agent] Rollback fallido tras error al almacenar: {rollback_error}")
             return False
-        finally:
-            cur.close()
-            conn.close()
     
     def _get_historical_metrics(self, days: int = 7) -> List[Dict[str, Any]]:
         """Obtiene métricas históricas de los últimos N días"""
-        conn = self._get_connection()
         try:
-            cur = conn.cursor()
-            
-            cur.execute("""
-            SELECT metric_name, value, created_at
-            FROM dashboard_results
-            WHERE created_at >= NOW() - INTERVAL '%s days'
-            ORDER BY created_at DESC
-            """, (days,))
-            
-            results = cur.fetchall()
-            logger.info(f"[Dashboard Agent] Obtenidas {len(results)} métricas históricas")
-            return results
+            with connection(self.database_url) as conn, conn.cursor() as cur:
+                cur.execute("""
+                SELECT metric_name, value, created_at
+                FROM dashboard_results
+                WHERE created_at >= NOW() - %s * INTERVAL '1 day'
+                ORDER BY created_at DESC
+                """, (days,))
+                
+                results = cur.fetchall()
+                logger.info(f"[Dashboard Agent] Obtenidas {len(results)} métricas históricas")
+                return results
             
         except Exception as e:
             logger.error(f"[Dashboard Agent] Error obteniendo métricas históricas: {e}")
             return []
-        finally:
-            cur.close()
-            conn.close()
     
     def _analyze_trends(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analiza tendencias en los datos históricos"""
@@ -214,14 +251,19 @@ class DashboardAgent(BaseAgent):
         """
         Ejecuta el agente Dashboard para generar métricas y análisis
         """
+        # Un único timestamp compartido por las métricas y el resumen
+        timestamp = datetime.now().isoformat()
         try:
             logger.info(f"[Dashboard Agent] Iniciando generación de métricas...")
             
+            # Tabla e índice de métricas históricas (una vez por proceso)
+            await asyncio.to_thread(self._ensure_history_index)
+            
             # Generar métricas actuales
-            current_metrics = self._generate_metrics()
+            current_metrics = await asyncio.to_thread(self._generate_metrics, timestamp)
             
             # Obtener métricas históricas
-            historical_data = self._get_historical_metrics(days=7)
+            historical_data = await asyncio.to_thread(self._get_historical_metrics, 7)
             
             # Analizar tendencias
             trend_analysis = self._analyze_trends(historical_data)
@@ -232,7 +274,7 @@ class DashboardAgent(BaseAgent):
                 "historical_data": historical_data,
                 "trend_analysis": trend_analysis,
                 "status": "success",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp
             }
             
             # Actualizar estado
@@ -246,6 +288,6 @@ class DashboardAgent(BaseAgent):
             state.dashboard_metrics = {
                 "error": str(e),
                 "status": "error",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp
             }
             return state
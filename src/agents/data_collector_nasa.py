@@ -8,8 +8,12 @@ Funcionalidad:
 - Incluye manejo de errores y fallback
 """
 
+import asyncio
 import httpx
+import json
+import logging
 import os
+import re
 from typing import Dict, Any, Optional, List
 from .base_agent import BaseAgent, AgentState
 from ..supervisors.hybrid_supervisor import HybridSupervisor
@@ -18,6 +22,11 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# IDs de NEO válidos (ej. "2000433"); se rechazan antes de consultar DB o API
+_NEO_ID_RE = re.compile(r"\A[A-Za-z0-9_-]{1,32}\Z")
+
 
 class DataCollectorAgentNASA(BaseAgent):
     """Agente que recolecta datos reales de asteroides desde NASA API."""
@@ -34,14 +43,14 @@ class DataCollectorAgentNASA(BaseAgent):
         # Conector PostgreSQL
         try:
             self.db = PostgreSQLConnector()
-            print("✅ Conector PostgreSQL inicializado")
+            logger.info("[DataCollectorAgent] Conector PostgreSQL inicializado")
         except Exception as e:
-            print(f"⚠️ Error inicializando PostgreSQL: {e}")
+            logger.warning(f"[DataCollectorAgent] Error inicializando PostgreSQL: {e}")
             self.db = None
     
     async def execute(self, state: AgentState) -> AgentState:
         """Ejecuta la recolección híbrida de datos."""
-        print("DataCollectorAgent: Iniciando recolección híbrida...")
+        logger.info("[DataCollectorAgent] Iniciando recolección híbrida...")
         
         try:
             if not self.validate_input(state):
@@ -59,16 +68,17 @@ class DataCollectorAgentNASA(BaseAgent):
             data_source = "unknown"
             
             if self.db:
-                print(f"DataCollectorAgent: Buscando datos en PostgreSQL para {asteroid_id}")
-                postgres_data = self.db.get_neo_by_id(asteroid_id)
+                logger.info(f"[DataCollectorAgent] Buscando datos en PostgreSQL para {asteroid_id}")
+                # El conector es síncrono: se ejecuta en un hilo para no bloquear el event loop
+                postgres_data = await asyncio.to_thread(self.db.get_neo_by_id, asteroid_id)
                 if postgres_data:
-                    print("DataCollectorAgent: Datos encontrados en PostgreSQL")
+                    logger.info("[DataCollectorAgent] Datos encontrados en PostgreSQL")
                     asteroid_data = self._format_postgres_data(postgres_data)
                     data_source = "postgresql"
             
             # 2. Si no hay datos en PostgreSQL, usar NASA API
             if not asteroid_data:
-                print(f"DataCollectorAgent: Recolectando datos de NASA API para {asteroid_id}")
+                logger.info(f"[DataCollectorAgent] Recolectando datos de NASA API para {asteroid_id}")
                 asteroid_data = await self._collect_real_data(asteroid_id)
                 data_source = "nasa_api"
             
@@ -79,7 +89,7 @@ class DataCollectorAgentNASA(BaseAgent):
             # 3. Obtener aproximaciones cercanas
             close_approach_data = []
             if self.db and data_source == "postgresql":
-                close_approach_data = self.db.get_close_approaches(asteroid_id)
+                close_approach_data = await asyncio.to_thread(self.db.get_close_approaches, asteroid_id)
             
             if not close_approach_data:
                 close_approach_data = self._process_close_approaches(asteroid_data)
@@ -127,10 +137,10 @@ class DataCollectorAgentNASA(BaseAgent):
                     }
                     
                     # Mostrar confianzas en consola
-                    print(f"DataCollectorAgent: Confianza general: {confidence_metrics.overall_confidence:.1%}")
-                    print(f"DataCollectorAgent: Confianza orbital: {confidence_metrics.orbital_confidence:.1%}")
-                    print(f"DataCollectorAgent: Confianza de datos: {confidence_metrics.data_quality_confidence:.1%}")
-                    print(f"DataCollectorAgent: Confianza de predicción: {confidence_metrics.prediction_confidence:.1%}")
+                    logger.info(f"[DataCollectorAgent] Confianza general: {confidence_metrics.overall_confidence:.1%}")
+                    logger.info(f"[DataCollectorAgent] Confianza orbital: {confidence_metrics.orbital_confidence:.1%}")
+                    logger.info(f"[DataCollectorAgent] Confianza de datos: {confidence_metrics.data_quality_confidence:.1%}")
+                    logger.info(f"[DataCollectorAgent] Confianza de predicción: {confidence_metrics.prediction_confidence:.1%}")
             
             # Actualizar estado (preservando confianzas si existen)
             state.data_collection_result.update({
@@ -142,10 +152,10 @@ class DataCollectorAgentNASA(BaseAgent):
                 "status": "success"
             })
             
-            print(f"DataCollectorAgent: Datos recolectados exitosamente desde {data_source}")
-            print(f"DataCollectorAgent: Asteroide: {asteroid_data.get('name', 'Unknown')}")
-            print(f"DataCollectorAgent: Diámetro: {asteroid_data.get('diameter_min', 0):.1f} - {asteroid_data.get('diameter_max', 0):.1f} km")
-            print(f"DataCollectorAgent: Peligroso: {asteroid_data.get('is_potentially_hazardous_asteroid', False)}")
+            logger.info(f"[DataCollectorAgent] Datos recolectados exitosamente desde {data_source}")
+            logger.info(f"[DataCollectorAgent] Asteroide: {asteroid_data.get('name', 'Unknown')}")
+            logger.info(f"[DataCollectorAgent] Diámetro: {asteroid_data.get('diameter_min', 0):.1f} - {asteroid_data.get('diameter_max', 0):.1f} km")
+            logger.info(f"[DataCollectorAgent] Peligroso: {asteroid_data.get('is_potentially_hazardous_asteroid', False)}")
             
         except Exception as e:
             self.log_error(state, f"Error: {str(e)}")
@@ -154,8 +164,8 @@ class DataCollectorAgentNASA(BaseAgent):
     
     def validate_input(self, state: AgentState) -> bool:
         """Valida datos de entrada."""
-        return (state.asteroid_data and 
-                state.asteroid_data.get("id"))
+        asteroid_id = state.asteroid_data.get("id") if state.asteroid_data else None
+        return bool(asteroid_id) and bool(_NEO_ID_RE.match(str(asteroid_id)))
     
     async def _collect_real_data(self, asteroid_id: str) -> Optional[Dict[str, Any]]:
         """Recolecta datos reales del asteroide desde NASA API."""
@@ -163,21 +173,21 @@ class DataCollectorAgentNASA(BaseAgent):
             url = f"{self.base_url}/neo/{asteroid_id}"
             params = {"api_key": self.api_key}
             
-            print(f"DataCollectorAgent: Llamando a NASA API: {url}")
+            logger.info(f"[DataCollectorAgent] Llamando a NASA API: {url}")
             
             async with httpx.AsyncClient() as client:
                 response = await client.get(url, params=params, timeout=30.0)
             
             if response.status_code == 200:
                 data = response.json()
-                print(f"DataCollectorAgent: Datos reales obtenidos exitosamente para {asteroid_id}")
+                logger.info(f"[DataCollectorAgent] Datos reales obtenidos exitosamente para {asteroid_id}")
                 return self._extract_asteroid_data(data)
             else:
-                print(f"DataCollectorAgent: Error en API: {response.status_code}")
+                logger.error(f"[DataCollectorAgent] Error en API: {response.status_code}")
                 return None
                 
         except Exception as e:
-            print(f"DataCollectorAgent: Error en recolección: {e}")
+            logger.error(f"[DataCollectorAgent] Error en recolección: {e}")
             return None
     
     def _extract_asteroid_data(self, api_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -272,9 +282,6 @@ class DataCollectorAgentNASA(BaseAgent):
             """
             
             # Llamar a Groq API
-            import httpx
-            import json
-            
             async with httpx.AsyncClient() as client:
                 response = await client.post(
                     "https://api.groq.com/openai/v1/chat/completions",
@@ -292,11 +299,11 @@ class DataCollectorAgentNASA(BaseAgent):
                 content = response.json()["choices"][0]["message"]["content"]
                 try:
                     return json.loads(content)
-                except:
-                    pass
+                except json.JSONDecodeError:
+                    logger.warning("[DataCollectorAgent] Respuesta LLM no es JSON válido")
             
         except Exception as e:
-            print(f"Error LLM: {e}")
+            logger.warning(f"[DataCollectorAgent] Error LLM: {e}")
         
         return self._get_fallback_prediction(asteroid_data, collection_data)
     
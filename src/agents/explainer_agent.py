@@ -3,10 +3,13 @@ ExplainerAgent - Agente que genera explicaciones científicas comprensibles
 Traduce datos técnicos complejos a lenguaje natural para usuarios
 """
 
+import logging
 from typing import Dict, Any, Optional, List
 from .base_agent import BaseAgent, AgentState
 from ..supervisors.hybrid_supervisor import HybridSupervisor
 
+logger = logging.getLogger(__name__)
+
 
 class ExplainerAgent(BaseAgent):
     """
@@ -36,7 +39,7 @@ class ExplainerAgent(BaseAgent):
         Returns:
             Estado actualizado con explicaciones generadas
         """
-        print("📚 ExplainerAgent: Generando explicaciones científicas...")
+        logger.info("[%s] Generando explicaciones científicas...", self.name)
         
         try:
             if not self.validate_input(state):
@@ -50,27 +53,8 @@ class ExplainerAgent(BaseAgent):
             mitigation_analysis = state.mitigation_analysis
             
             # Generar explicaciones
-            explanations = {}
-            
-            # 1. Explicación general del asteroide
-            if asteroid_data:
-                explanations["asteroid_summary"] = self._explain_asteroid_basics(asteroid_data)
-            
-            # 2. Explicación de trayectoria
-            if trajectory_analysis:
-                explanations["trajectory_explanation"] = self._explain_trajectory(trajectory_analysis)
-            
-            # 3. Explicación de impacto
-            if impact_analysis:
-                explanations["impact_explanation"] = self._explain_impact(impact_analysis)
-            
-            # 4. Explicación de mitigación
-            if mitigation_analysis:
-                explanations["mitigation_explanation"] = self._explain_mitigation(mitigation_analysis)
-            
-            # 5. Explicación de riesgo general
-            explanations["risk_summary"] = self._explain_risk_overview(
-                asteroid_data, trajectory_analysis, impact_analysis
+            explanations = self.explain_all(
+                asteroid_data, trajectory_analysis, impact_analysis, mitigation_analysis
             )
             
             # Actualizar estado
@@ -80,19 +64,85 @@ class ExplainerAgent(BaseAgent):
                 "message": "Explicaciones generadas exitosamente"
             }
             
-            print("✅ ExplainerAgent: Explicaciones generadas exitosamente")
+            logger.info("[%s] Explicaciones generadas exitosamente", self.name)
             
         except Exception as e:
+            logger.exception("[%s] Error generando explicaciones", self.name)
             self.log_error(state, f"Error generando explicaciones: {str(e)}")
         
         return state
     
-    def _explain_asteroid_basics(self, asteroid_data: Dict[str, Any]) -> Dict[str, Any]:
+    def explain_all(self, asteroid_data: Dict[str, Any],
+                    trajectory_analysis: Dict[str, Any],
+                    impact_analysis: Dict[str, Any],
+                    mitigation_analysis: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Genera todas las explicaciones en una sola pasada.
+        
+        Los valores que usan varias explicaciones (diámetro, peligrosidad,
+        distancia de aproximación y energía) se extraen una sola vez y se
+        pasan a cada `_explain_*`.
+        
+        Args:
+            asteroid_data: Datos básicos del asteroide
+            trajectory_analysis: Resultado del análisis de trayectoria
+            impact_analysis: Resultado del análisis de impacto
+            mitigation_analysis: Resultado del análisis de mitigación
+            
+        Returns:
+            Diccionario con cada explicación generada
+        """
+        explanations = {}
+        shared = self._extract_shared_values(
+            asteroid_data or {}, trajectory_analysis or {}, impact_analysis or {}
+        )
+        
+        # 1. Explicación general del asteroide
+        if asteroid_data:
+            explanations["asteroid_summary"] = self._explain_asteroid_basics(
+                asteroid_data, shared["diameter"], shared["is_hazardous"]
+            )
+        
+        # 2. Explicación de trayectoria
+        if trajectory_analysis:
+            explanations["trajectory_explanation"] = self._explain_trajectory(trajectory_analysis)
+        
+        # 3. Explicación de impacto
+        if impact_analysis:
+            explanations["impact_explanation"] = self._explain_impact(impact_analysis, shared["energy_mt"])
+        
+        # 4. Explicación de mitigación
+        if mitigation_analysis:
+            explanations["mitigation_explanation"] = self._explain_mitigation(mitigation_analysis)
+        
+        # 5. Explicación de riesgo general
+        explanations["risk_summary"] = self._explain_risk_overview(
+            shared["diameter"], shared["is_hazardous"], shared["distance_km"],
+            shared["eccentricity"], shared["energy_mt"]
+        )
+        
+        return explanations
+    
+    def _extract_shared_values(self, asteroid_data: Dict[str, Any],
+                               trajectory_analysis: Dict[str, Any],
+                               impact_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Extrae los valores que comparten varias explicaciones"""
+        closest_approach = trajectory_analysis.get('closest_approach', {})
+        impact_energy = impact_analysis.get('impact_energy', {})
+        
+        return {
+            "diameter": asteroid_data.get('diameter', 0),
+            "is_hazardous": asteroid_data.get('is_potentially_hazardous', False),
+            "distance_km": float(closest_approach.get('distance_km', float('inf'))),
+            "eccentricity": trajectory_analysis.get('eccentricity', 0),
+            "energy_mt": impact_energy.get('megatons', 0) if isinstance(impact_energy, dict) else 0
+        }
+    
+    def _explain_asteroid_basics(self, asteroid_data: Dict[str, Any], diameter: float,
+                                 is_potentially_hazardous: bool) -> Dict[str, Any]:
         """Genera explicación básica del asteroide"""
         try:
             name = asteroid_data.get('name', 'Asteroid desconocido')
-            diameter = asteroid_data.get('diameter', 0)
-            is_potentially_hazardous = asteroid_data.get('is_potentially_hazardous', False)
             
             # Convertir diámetro a metros si está en kilómetros
             if diameter > 1000:  # Asumir que está en metros
@@ -109,6 +159,9 @@ class ExplainerAgent(BaseAgent):
             # Generar contexto científico
             scientific_context = self._generate_scientific_context(diameter_km, is_potentially_hazardous)
             
+            # Clasificar por tamaño una sola vez (se usa en key_facts y size_category)
+            size_category = self._classify_asteroid_size(diameter_km)
+            
             # Crear resumen general
             summary = f"El asteroide {name} es un objeto espacial de {diameter_km:.1f} km de diámetro. {size_explanation} {hazard_explanation}"
             
@@ -118,10 +171,10 @@ class ExplainerAgent(BaseAgent):
                     f"Nombre: {name}",
                     f"Diámetro: {diameter_km:.1f} km",
                     f"Estado de peligro: {'Potencialmente peligroso' if is_potentially_hazardous else 'No peligroso'}",
-                    f"Clasificación: {self._classify_asteroid_size(diameter_km)}"
+                    f"Clasificación: {size_category}"
                 ],
                 "scientific_context": scientific_context,
-                "size_category": self._classify_asteroid_size(diameter_km),
+                "size_category": size_category,
                 "hazard_level": "Alto" if is_potentially_hazardous else "Bajo"
             }
             
@@ -368,20 +421,16 @@ class ExplainerAgent(BaseAgent):
         else:
             return "Bajo - Órbita estable y distante"
     
-    def _explain_impact(self, impact_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    def _explain_impact(self, impact_analysis: Dict[str, Any], energy_mt: float) -> Dict[str, Any]:
         """Genera explicación del impacto potencial"""
         try:
             # Extraer datos del análisis de impacto
-            impact_energy = impact_analysis.get('impact_energy', {})
             crater_diameter = impact_analysis.get('crater_diameter_km', 0)
             seismic_radius = impact_analysis.get('seismic_radius_km', 0)
             tsunami_radius = impact_analysis.get('tsunami_radius_km', 0)
             thermal_radius = impact_analysis.get('thermal_radius_km', 0)
             blast_radius = impact_analysis.get('blast_radius_km', 0)
             
-            # Obtener energía en megatones
-            energy_mt = impact_energy.get('megatons', 0) if isinstance(impact_energy, dict) else 0
-            
             # Generar explicaciones
             energy_explanation = self._explain_impact_energy(energy_mt)
             crater_explanation = self._explain_crater_effects(crater_diameter)
@@ -609,24 +658,10 @@ class ExplainerAgent(BaseAgent):
         
         return timeline
     
-    def _explain_risk_overview(self, asteroid_data: Dict[str, Any], 
-                              trajectory_analysis: Dict[str, Any], 
-                              impact_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    def _explain_risk_overview(self, diameter: float, is_hazardous: bool, distance_km: float,
+                              eccentricity: float, energy_mt: float) -> Dict[str, Any]:
         """Genera resumen general del riesgo"""
         try:
-            # Analizar datos del asteroide
-            diameter = asteroid_data.get('diameter', 0)
-            is_hazardous = asteroid_data.get('is_potentially_hazardous', False)
-            
-            # Analizar trayectoria
-            closest_approach = trajectory_analysis.get('closest_approach', {})
-            distance_km = float(closest_approach.get('distance_km', float('inf')))
-            eccentricity = trajectory_analysis.get('eccentricity', 0)
-            
-            # Analizar impacto
-            impact_energy = impact_analysis.get('impact_energy', {})
-            energy_mt = impact_energy.get('megatons', 0)
-            
             # Calcular riesgo general
             overall_risk = self._calculate_overall_risk(diameter, is_hazardous, distance_km, energy_mt)
             
@@ -9,8 +9,11 @@ Funcionalidad:
 - Genera predicciones con confianza
 """
 
+import json
+import logging
 import math
 import os
+import httpx
 from typing import Dict, Any, List, Optional
 from .base_agent import BaseAgent, AgentState
 from ..supervisors.hybrid_supervisor import HybridSupervisor
@@ -18,6 +21,8 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class ImpactAnalyzerAgent(BaseAgent):
     """Agente que analiza efectos de impacto de asteroides."""
@@ -36,7 +41,7 @@ class ImpactAnalyzerAgent(BaseAgent):
     
     async def execute(self, state: AgentState) -> AgentState:
         """Ejecuta análisis de impacto del asteroide."""
-        print("ImpactAnalyzerAgent: Analizando impacto...")
+        logger.info("[ImpactAnalyzerAgent] Analizando impacto...")
         
         try:
             if not self.validate_input(state):
@@ -114,9 +119,9 @@ class ImpactAnalyzerAgent(BaseAgent):
                     }
                     
                     # Mostrar confianzas en consola
-                    print(f"ImpactAnalyzerAgent: Confianza general: {confidence_metrics.overall_confidence:.1%}")
-                    print(f"ImpactAnalyzerAgent: Confianza científica: {confidence_metrics.scientific_confidence:.1%}")
-                    print(f"ImpactAnalyzerAgent: Confianza de predicción: {confidence_metrics.prediction_confidence:.1%}")
+                    logger.info(f"[ImpactAnalyzerAgent] Confianza general: {confidence_metrics.overall_confidence:.1%}")
+                    logger.info(f"[ImpactAnalyzerAgent] Confianza científica: {confidence_metrics.scientific_confidence:.1%}")
+                    logger.info(f"[ImpactAnalyzerAgent] Confianza de predicción: {confidence_metrics.prediction_confidence:.1%}")
             
             # Actualizar estado (preservando confianzas si existen)
             state.impact_analysis.update({
@@ -129,8 +134,8 @@ class ImpactAnalyzerAgent(BaseAgent):
                 "status": "success"
             })
             
-            print(f"ImpactAnalyzerAgent: Energía: {impact_energy['total_energy_mt_tnt']:.1f} MT TNT")
-            print(f"ImpactAnalyzerAgent: Cráter: {crater_size['diameter_km']:.1f} km")
+            logger.info(f"[ImpactAnalyzerAgent] Energía: {impact_energy['total_energy_mt_tnt']:.1f} MT TNT")
+            logger.info(f"[ImpactAnalyzerAgent] Cráter: {crater_size['diameter_km']:.1f} km")
             
         except Exception as e:
             self.log_error(state, f"Error: {str(e)}")
@@ -371,9 +376,6 @@ class ImpactAnalyzerAgent(BaseAgent):
             """
             
             # Llamar a Groq API
-            import httpx
-            import json
-            
             async with httpx.AsyncClient() as client:
                 response = await client.post(
                     "https://api.groq.com/openai/v1/chat/completions",
@@ -391,11 +393,11 @@ class ImpactAnalyzerAgent(BaseAgent):
                 content = response.json()["choices"][0]["message"]["content"]
                 try:
                     return json.loads(content)
-                except:
-                    pass
+                except json.JSONDecodeError:
+                    logger.warning("[ImpactAnalyzerAgent] Respuesta LLM no es JSON válido")
             
         except Exception as e:
-            print(f"Error LLM: {e}")
+            logger.warning(f"[ImpactAnalyzerAgent] Error LLM: {e}")
         
         return self._get_fallback_prediction(asteroid_data, impact_data)
     
@@ -8,8 +8,11 @@ Funcionalidad:
 - Usa base de datos vectorial para contexto
 """
 
+import json
+import logging
 import math
 import os
+import httpx
 from typing import Dict, Any, List, Optional
 from .base_agent import BaseAgent, AgentState
 from ..supervisors.hybrid_supervisor import HybridSupervisor
@@ -17,6 +20,8 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class MitigationAgent(BaseAgent):
     """Agente que evalúa estrategias de mitigación de asteroides."""
@@ -39,7 +44,7 @@ class MitigationAgent(BaseAgent):
     
     async def execute(self, state: AgentState) -> AgentState:
         """Ejecuta evaluación de estrategias de mitigación."""
-        print("MitigationAgent: Evaluando estrategias...")
+        logger.info("[MitigationAgent] Evaluando estrategias...")
         
         try:
             if not self.validate_input(state):
@@ -94,13 +99,13 @@ class MitigationAgent(BaseAgent):
                     }
                     
                     # Mostrar confianzas en consola
-                    print(f"MitigationAgent: Confianza general: {confidence_metrics.overall_confidence:.1%}")
-                    print(f"MitigationAgent: Confianza científica: {confidence_metrics.scientific_confidence:.1%}")
-                    print(f"MitigationAgent: Confianza de predicción: {confidence_metrics.prediction_confidence:.1%}")
+                    logger.info(f"[MitigationAgent] Confianza general: {confidence_metrics.overall_confidence:.1%}")
+                    logger.info(f"[MitigationAgent] Confianza científica: {confidence_metrics.scientific_confidence:.1%}")
+                    logger.info(f"[MitigationAgent] Confianza de predicción: {confidence_metrics.prediction_confidence:.1%}")
             
             # Actualizar estado
             state.mitigation_strategies = strategies
-            print(f"MitigationAgent: {len(strategies)} estrategias evaluadas")
+            logger.info(f"[MitigationAgent] {len(strategies)} estrategias evaluadas")
             
         except Exception as e:
             self.log_error(state, f"Error: {str(e)}")
@@ -172,9 +177,6 @@ class MitigationAgent(BaseAgent):
             """
             
             # Llamar a Groq API (simplificado)
-            import httpx
-            import json
-            
             async with httpx.AsyncClient() as client:
                 response = await client.post(
                     "https://api.groq.com/openai/v1/chat/completions",
@@ -192,11 +194,11 @@ class MitigationAgent(BaseAgent):
                 content = response.json()["choices"][0]["message"]["content"]
                 try:
                     return json.loads(content)
-                except:
-                    pass
+                except json.JSONDecodeError:
+                    logger.warning("[MitigationAgent] Respuesta LLM no es JSON válido")
             
         except Exception as e:
-            print(f"Error LLM: {e}")
+            logger.warning(f"[MitigationAgent] Error LLM: {e}")
         
         return self._get_fallback_prediction(asteroid_data, strategies)
     
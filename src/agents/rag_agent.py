@@ -3,6 +3,8 @@ RAG Agent para búsqueda vectorial y análisis de documentos
 Integrado desde workspace/prototipo1/agents/neo_rag_agent/
 """
 
+import asyncio
+import hashlib
 import os
 import time
 import psycopg2
@@ -10,14 +12,17 @@ import psycopg2.extras
 import requests
 import json
 from datetime import datetime
-import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any
 import logging
 
 from .base_agent import BaseAgent, AgentState
+from ..database.connection import connection
 
 logger = logging.getLogger(__name__)
 
+# Tiempo de vida (segundos) de los datos de NEOs obtenidos de la NASA API
+NEO_DATA_CACHE_TTL = 300
+
 class RAGAgent(BaseAgent):
     """
     Agente RAG (Retrieval-Augmented Generation) para búsqueda vectorial
@@ -30,29 +35,25 @@ class RAGAgent(BaseAgent):
         self.description = "Agente RAG para búsqueda vectorial y análisis de documentos"
         self.database_url = os.getenv("DATABASE_URL")
         self.nasa_api_key = os.getenv("NASA_API_KEY")
-    
-    def _get_connection(self, retries: int = 5, delay: int = 5):
-        """Intentos de conexión a la base de datos con reintentos."""
-        for i in range(retries):
-            try:
-                conn = psycopg2.connect(
-                    self.database_url, 
-                    cursor_factory=psycopg2.extras.RealDictCursor
-                )
-                return conn
-            except psycopg2.OperationalError:
-                logger.warning(f"[RAG Agent] DB no disponible, reintentando ({i+1}/{retries})...")
-                time.sleep(delay)
-        raise Exception("[RAG Agent] No se pudo conectar a la DB")
+        # Caché (timestamp, datos) para no repetir la llamada a la NASA API
+        self._neo_data_cache = None
+        # Sesión HTTP reutilizable (mantiene la conexión TLS con la NASA API)
+        self._http = requests.Session()
     
     def _get_neo_data(self) -> List[Dict[str, Any]]:
-        """Obtiene datos reales de NEOs de la NASA API."""
+        """Obtiene datos reales de NEOs de la NASA API (con caché TTL)."""
         if not self.nasa_api_key:
             logger.warning("NASA_API_KEY no encontrada, usando datos de prueba")
             return self._get_mock_neo_data()
         
+        if self._neo_data_cache is not None:
+            cached_at, cached_neos = self._neo_data_cache
+            if time.monotonic() - cached_at < NEO_DATA_CACHE_TTL:
+                logger.info(f"[RAG Agent] Usando {len(cached_neos)} NEOs en caché")
+                return cached_neos
+        
         try:
-            response = requests.get(
+            response = self._http.get(
                 "https://api.nasa.gov/neo/rest/v1/neo/browse",
                 params={
                     "api_key": self.nasa_api_key,
@@ -98,6 +99,7 @@ class RAGAgent(BaseAgent):
                 neos.append(neo)
             
             logger.info(f"[RAG Agent] Obtenidos {len(neos)} NEOs de la NASA API")
+            self._neo_data_cache = (time.monotonic(), neos)
             return neos
             
         except Exception as e:
@@ -135,13 +137,7 @@ class RAGAgent(BaseAgent):
     
     def _store_documents(self, neos: List[Dict[str, Any]]) -> int:
         """Almacena documentos en la base de datos para búsqueda vectorial"""
-        conn = self._get_connection()
         try:
-            cur = conn.cursor()
-            
-            # Limpiar documentos existentes
-            cur.execute("DELETE FROM documents WHERE source = 'nasa_api'")
-            
             documents = []
             for neo in neos:
                 # Crear contenido del documento
@@ -177,26 +173,27 @@ class RAGAgent(BaseAgent):
                     embedding
                 ))
             
-            # Insertar documentos
-            insert_query = """
-            INSERT INTO documents (id, source, content, metadata, embedding)
-            VALUES %s
-            """
-            psycopg2.extras.execute_values(
-                cur, insert_query, documents, template=None, page_size=100
-            )
+            # Reemplazar documentos en una sola transacción: el context
+            # manager hace commit al salir o rollback si algo falla
+            with connection(self.database_url) as conn, conn.cursor() as cur:
+                # Limpiar documentos existentes
+                cur.execute("DELETE FROM documents WHERE source = 'nasa_api'")
+                
+                # Insertar documentos
+                insert_query = """
+                INSERT INTO documents (id, source, content, metadata, embedding)
+                VALUES %s
+                """
+                psycopg2.extras.execute_values(
+                    cur, insert_query, documents, template=None, page_size=100
+                )
             
-            conn.commit()
             logger.info(f"[RAG Agent] Almacenados {len(documents)} documentos")
             return len(documents)
             
         except Exception as e:
             logger.error(f"[RAG Agent] Error almacenando documentos: {e}")
-            conn.rollback()
             return 0
-        finally:
-            cur.close()
-            conn.close()
     
     def _create_simple_embedding(self, text: str) -> List[float]:
         """Crea un embedding simple basado en características del texto"""
@@ -224,7 +221,6 @@ class RAGAgent(BaseAgent):
                 embedding[i] = float(feature) / 1000.0  # Normalizar
         
         # Rellenar con valores aleatorios basados en el hash del texto
-        import hashlib
         text_hash = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
         for i in range(len(features), 1536):
             embedding[i] = (text_hash % 1000) / 1000.0
@@ -232,37 +228,38 @@ class RAGAgent(BaseAgent):
         
         return embedding
     
-    def _search_documents(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
-        """Busca documentos similares usando búsqueda vectorial"""
-        conn = self._get_connection()
+    def _search_documents(self, query: str, top_k: int = 5,
+                          content_chars: int = 200) -> List[Dict[str, Any]]:
+        """
+        Busca documentos similares usando búsqueda vectorial.
+        
+        El contenido se trunca en PostgreSQL a `content_chars` caracteres
+        para no transferir el documento completo.
+        """
         try:
-            cur = conn.cursor()
-            
             # Crear embedding de la consulta
             query_embedding = self._create_simple_embedding(query)
             query_vector = "[" + ",".join(map(str, query_embedding)) + "]"
             
-            # Búsqueda vectorial
+            # Búsqueda vectorial (el vector de consulta se envía una sola vez)
             search_query = """
-            SELECT id, source, content, metadata, 
+            SELECT id, source, LEFT(content, %s) AS content, metadata,
                    (embedding <-> %s::vector) AS distance
             FROM documents
-            ORDER BY embedding <-> %s::vector
+            ORDER BY distance
             LIMIT %s
             """
             
-            cur.execute(search_query, (query_vector, query_vector, top_k))
-            results = cur.fetchall()
-            
-            logger.info(f"[RAG Agent] Encontrados {len(results)} documentos para consulta: {query}")
-            return results
+            with connection(self.database_url) as conn, conn.cursor() as cur:
+                cur.execute(search_query, (content_chars, query_vector, top_k))
+                results = cur.fetchall()
+                
+                logger.info(f"[RAG Agent] Encontrados {len(results)} documentos para consulta: {query}")
+                return results
             
         except Exception as e:
             logger.error(f"[RAG Agent] Error en búsqueda vectorial: {e}")
             return []
-        finally:
-            cur.close()
-            conn.close()
     
     async def execute(self, state: AgentState) -> AgentState:
         """
@@ -272,10 +269,10 @@ class RAGAgent(BaseAgent):
             logger.info(f"[RAG Agent] Iniciando análisis RAG...")
             
             # Obtener datos de NEOs
-            neos = self._get_neo_data()
+            neos = await asyncio.to_thread(self._get_neo_data)
             
             # Almacenar documentos
-            documents_stored = self._store_documents(neos)
+            documents_stored = await asyncio.to_thread(self._store_documents, neos)
             
             # Realizar búsquedas de ejemplo
             search_queries = [
@@ -285,14 +282,19 @@ class RAGAgent(BaseAgent):
                 "monitoreo de asteroides"
             ]
             
+            # Las búsquedas son independientes: se lanzan en paralelo
+            all_results = await asyncio.gather(*(
+                asyncio.to_thread(self._search_documents, query, 3)
+                for query in search_queries
+            ))
+            
             search_results = {}
-            for query in search_queries:
-                results = self._search_documents(query, top_k=3)
+            for query, results in zip(search_queries, all_results):
                 search_results[query] = [
                     {
                         "id": row["id"],
                         "source": row["source"],
-                        "content": row["content"][:200] + "...",  # Truncar contenido
+                        "content": row["content"] + "...",  # Truncado en SQL
                         "metadata": row["metadata"],
                         "similarity": 1.0 - float(row["distance"])  # Convertir distancia a similitud
                     }
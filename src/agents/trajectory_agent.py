@@ -10,8 +10,11 @@ Funcionalidad:
 - Genera predicciones con confianza
 """
 
+import json
+import logging
 import math
 import os
+import httpx
 from typing import Dict, Any, List, Optional
 from .base_agent import BaseAgent, AgentState
 from ..supervisors.hybrid_supervisor import HybridSupervisor
@@ -19,6 +22,8 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class TrajectoryAgent(BaseAgent):
     """Agente que analiza trayectorias orbitales de asteroides."""
@@ -36,7 +41,7 @@ class TrajectoryAgent(BaseAgent):
     
     async def execute(self, state: AgentState) -> AgentState:
         """Ejecuta análisis de trayectoria orbital."""
-        print("TrajectoryAgent: Analizando trayectoria...")
+        logger.info("[TrajectoryAgent] Analizando trayectoria...")
         
         try:
             if not self.validate_input(state):
@@ -99,9 +104,9 @@ class TrajectoryAgent(BaseAgent):
                     }
                     
                     # Mostrar confianzas en consola
-                    print(f"TrajectoryAgent: Confianza general: {confidence_metrics.overall_confidence:.1%}")
-                    print(f"TrajectoryAgent: Confianza orbital: {confidence_metrics.orbital_confidence:.1%}")
-                    print(f"TrajectoryAgent: Confianza de predicción: {confidence_metrics.prediction_confidence:.1%}")
+                    logger.info(f"[TrajectoryAgent] Confianza general: {confidence_metrics.overall_confidence:.1%}")
+                    logger.info(f"[TrajectoryAgent] Confianza orbital: {confidence_metrics.orbital_confidence:.1%}")
+                    logger.info(f"[TrajectoryAgent] Confianza de predicción: {confidence_metrics.prediction_confidence:.1%}")
             
             # Actualizar estado (preservando confianzas si existen)
             state.trajectory_analysis.update({
@@ -112,7 +117,7 @@ class TrajectoryAgent(BaseAgent):
                 "status": "success"
             })
             
-            print(f"TrajectoryAgent: Probabilidad de impacto: {impact_probability:.1%}")
+            logger.info(f"[TrajectoryAgent] Probabilidad de impacto: {impact_probability:.1%}")
             
         except Exception as e:
             self.log_error(state, f"Error: {str(e)}")
@@ -237,9 +242,6 @@ class TrajectoryAgent(BaseAgent):
             """
             
             # Llamar a Groq API
-            import httpx
-            import json
-            
             async with httpx.AsyncClient() as client:
                 response = await client.post(
                     "https://api.groq.com/openai/v1/chat/completions",
@@ -257,11 +259,11 @@ class TrajectoryAgent(BaseAgent):
                 content = response.json()["choices"][0]["message"]["content"]
                 try:
                     return json.loads(content)
-                except:
-                    pass
+                except json.JSONDecodeError:
+                    logger.warning("[TrajectoryAgent] Respuesta LLM no es JSON válido")
             
         except Exception as e:
-            print(f"Error LLM: {e}")
+            logger.warning(f"[TrajectoryAgent] Error LLM: {e}")
         
         return self._get_fallback_prediction(asteroid_data, trajectory_data)
     
@@ -13,6 +13,7 @@ Especialidad: Visualización científica, gráficos, comunicación visual
 
 import math
 import json
+import logging
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from .base_agent import BaseAgent, AgentState
@@ -21,6 +22,19 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Configuración de visualización (constante, compartida por todas las instancias)
+CHART_COLORS = {
+    'trajectory': '#2E86AB',
+    'impact_zone': '#F24236',
+    'confidence': '#F6AE2D',
+    'risk': '#7209B7',
+    'safe_zone': '#06D6A0'
+}
+CONFIDENCE_CATEGORIES = ('Científica', 'RAG', 'Orbital', 'Calidad', 'Predicción')
+CONFIDENCE_COLORS = tuple(CHART_COLORS.values())
+
 
 class VisualizationAgent(BaseAgent):
     """
@@ -42,13 +56,7 @@ class VisualizationAgent(BaseAgent):
         self.supervisor = supervisor
         
         # Configuración de visualización
-        self.chart_colors = {
-            'trajectory': '#2E86AB',
-            'impact_zone': '#F24236', 
-            'confidence': '#F6AE2D',
-            'risk': '#7209B7',
-            'safe_zone': '#06D6A0'
-        }
+        self.chart_colors = CHART_COLORS
     
     async def execute(self, state: AgentState) -> AgentState:
         """
@@ -60,7 +68,7 @@ class VisualizationAgent(BaseAgent):
         Returns:
             AgentState actualizado con visualizaciones generadas
         """
-        print("VisualizationAgent: Generando visualizaciones...")
+        logger.info("[%s] Generando visualizaciones...", self.name)
         
         try:
             if not self.validate_input(state):
@@ -144,10 +152,11 @@ class VisualizationAgent(BaseAgent):
                         'alert_level': confidence_metrics.alert_level
                     }
             
-            print(f"VisualizationAgent: {len(visualizations)} visualizaciones generadas")
+            logger.info("[%s] %d visualizaciones generadas", self.name, len(visualizations))
             return state
             
         except Exception as e:
+            logger.exception("[%s] Error generando visualizaciones", self.name)
             self.log_error(state, f"Error generando visualizaciones: {str(e)}")
             return state
     
@@ -222,12 +231,12 @@ class VisualizationAgent(BaseAgent):
             'type': 'confidence_chart',
             'title': "Métricas de Confianza del Sistema",
             'data': {
-                'categories': ['Científica', 'RAG', 'Orbital', 'Calidad', 'Predicción'],
+                'categories': list(CONFIDENCE_CATEGORIES),
                 'values': []  # Se llenará con valores reales
             },
             'config': {
                 'chart_type': 'radar',
-                'colors': list(self.chart_colors.values())
+                'colors': list(CONFIDENCE_COLORS)
             }
         }
     
@@ -0,0 +1,191 @@
+"""
+Conexiones PostgreSQL compartidas por los agentes.
+
+Centraliza los parámetros de conexión (keepalives TCP, tipos numéricos)
+que antes se repetían en cada agente con acceso a la base de datos, y
+mantiene un pool de conexiones por DSN para no abrir una conexión nueva
+(TCP + autenticación) en cada consulta.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+
+logger = logging.getLogger(__name__)
+
+# Tamaño del pool de conexiones por DSN
+POOL_MIN_CONN = 5
+POOL_MAX_CONN = 20
+
+# Solo se comprueban con un ping las conexiones inactivas más tiempo que esto
+POOL_PING_IDLE_SECONDS = 30
+
+# Keepalives TCP: evitan que NAT/balanceadores cierren conexiones inactivas
+CONNECTION_KWARGS = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3,
+    "tcp_user_timeout": 10000,
+}
+
+# NUMERIC/DECIMAL -> float: evita objetos Decimal (dtype object) en pandas
+DEC2FLOAT = psycopg2.extensions.new_type(
+    psycopg2.extensions.DECIMAL.values,
+    "DEC2FLOAT",
+    lambda value, cur: float(value) if value is not None else None
+)
+
+
+_pools: Dict[str, psycopg2.pool.ThreadedConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+# Última devolución al pool de cada conexión (id(conn) -> time.monotonic())
+_last_used: Dict[int, float] = {}
+
+
+def get_pool(database_url: str) -> psycopg2.pool.ThreadedConnectionPool:
+    """
+    Devuelve el pool de conexiones del DSN, creándolo la primera vez.
+    
+    Args:
+        database_url: DSN de PostgreSQL
+        
+    Returns:
+        Pool thread-safe compartido por todos los agentes del proceso
+    """
+    pool = _pools.get(database_url)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(database_url)
+            if pool is None:
+                pool = psycopg2.pool.ThreadedConnectionPool(
+                    POOL_MIN_CONN,
+                    POOL_MAX_CONN,
+                    database_url,
+                    cursor_factory=psycopg2.extras.RealDictCursor,
+                    **CONNECTION_KWARGS
+                )
+                _pools[database_url] = pool
+    return pool
+
+
+def _is_alive(conn) -> bool:
+    """
+    Comprueba que una conexión del pool siga abierta en el servidor.
+    
+    Un backend terminado (reinicio, pg_terminate_backend, timeout de
+    inactividad) no se detecta hasta usar la conexión, así que se hace
+    un `SELECT 1` en autocommit (un solo round-trip, sin transacción).
+    Las conexiones usadas hace menos de POOL_PING_IDLE_SECONDS no se
+    comprueban: si se cayeron, `connection()` las cierra al fallar.
+    """
+    if conn.closed:
+        return False
+    last_used = _last_used.get(id(conn))
+    if last_used is not None and time.monotonic() - last_used < POOL_PING_IDLE_SECONDS:
+        return True
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.autocommit = False
+        return True
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        return False
+
+
+def acquire(database_url: str):
+    """
+    Toma una conexión viva del pool (RealDictCursor, keepalives, NUMERIC como float).
+    
+    Las conexiones caídas se descartan y se toma otra; si el pool ya no
+    tiene conexiones sanas, abre una nueva. Solo se hace ping a las que
+    llevan tiempo inactivas.
+    
+    Toda conexión obtenida aquí debe devolverse con `release`.
+    
+    Args:
+        database_url: DSN de PostgreSQL
+        
+    Returns:
+        Conexión psycopg2 lista para usar
+        
+    Raises:
+        psycopg2.OperationalError: Si no se puede abrir una conexión nueva
+        psycopg2.pool.PoolError: Si el pool está agotado
+    """
+    pool = get_pool(database_url)
+    # Como mucho POOL_MAX_CONN conexiones caídas antes de abrir una nueva
+    for _ in range(POOL_MAX_CONN + 1):
+        conn = pool.getconn()
+        if _is_alive(conn):
+            psycopg2.extensions.register_type(DEC2FLOAT, conn)
+            return conn
+        logger.warning("Conexión del pool caída, se descarta")
+        _last_used.pop(id(conn), None)
+        pool.putconn(conn, close=True)
+    raise psycopg2.OperationalError("No se obtuvo una conexión viva del pool")
+
+
+def release(database_url: str, conn, close: bool = False) -> None:
+    """
+    Devuelve una conexión al pool.
+    
+    El pool hace rollback de cualquier transacción abierta antes de
+    reutilizar la conexión.
+    
+    Args:
+        database_url: DSN de PostgreSQL
+        conn: Conexión obtenida con `acquire`
+        close: Cerrar la conexión en vez de reutilizarla (p. ej. si se cayó)
+    """
+    close = close or bool(conn.closed)
+    if close:
+        _last_used.pop(id(conn), None)
+    else:
+        _last_used[id(conn)] = time.monotonic()
+    get_pool(database_url).putconn(conn, close=close)
+
+
+@contextmanager
+def connection(database_url: str, retries: int = 5, delay: int = 5):
+    """
+    Conexión del pool como context manager.
+    
+    Reintenta la obtención mientras la DB no esté disponible o el pool
+    esté agotado; `acquire` ya descarta las conexiones inactivas que se
+    cayeron antes de entregarlas. Hace commit al salir sin errores,
+    rollback si hay excepción y devuelve la conexión al pool, o la cierra
+    si se perdió durante el uso para que no vuelva a entregarse.
+    
+    Args:
+        database_url: DSN de PostgreSQL
+        retries: Intentos de obtener una conexión
+        delay: Segundos de espera entre intentos
+    """
+    for i in range(retries):
+        try:
+            conn = acquire(database_url)
+            break
+        except (psycopg2.OperationalError, psycopg2.pool.PoolError):
+            logger.warning(f"DB no disponible, reintentando ({i+1}/{retries})...")
+            time.sleep(delay)
+    else:
+        raise Exception("No se pudo conectar a la DB")
+    
+    broken = False
+    try:
+        with conn:
+            yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        release(database_url, conn, close=broken)